@@ -0,0 +1,144 @@
+"""Measure the cold start cost of the enrichment Lambda function.
+
+Each run imports lambda_function in a fresh interpreter, which covers the
+function's whole init phase: importing boto3, PyMuPDF and the thread pool and
+creating the S3 and Bedrock Runtime clients. The init phase is timed in a plain
+interpreter, comparable to the Lambda "Init Duration"; a second interpreter run
+with `python -X importtime` breaks out the boto3 and fitz import times.
+boto3 and PyMuPDF (fitz) must be installed, otherwise the numbers would not
+reflect a cold start and the script fails.
+
+Usage:
+    python benchmarks/import_time.py --release v1.2.0 --output benchmarks/import_time.json
+
+Results are appended to the --output file keyed by release (the current git
+commit by default), so the cost can be tracked from one release to the next.
+tests/benchmarks/test_import_time.py runs the same measurement against
+INIT_BUDGET_MS as part of the test suite.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(PROJECT_DIR, 'setup', 'doc_enrichment_lambda')
+
+REQUIRED_MODULES = ['boto3', 'fitz']
+
+# Default --max-ms budget for the init phase, also enforced by the test suite
+INIT_BUDGET_MS = 1000
+
+# Times the init phase from the first import of the handler module to the end of its module body
+INIT_SCRIPT = (
+    "import time; start = time.perf_counter(); import lambda_function; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def missing_modules():
+    return [module for module in REQUIRED_MODULES if importlib.util.find_spec(module) is None]
+
+
+def lambda_environment(provisioned):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    # Mirror the Lambda environment, where the region and credentials come from environment variables
+    env.setdefault('AWS_REGION', 'us-east-1')
+    env.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    env['AWS_EC2_METADATA_DISABLED'] = 'true'
+    if provisioned:
+        env['AWS_LAMBDA_INITIALIZATION_TYPE'] = 'provisioned-concurrency'
+    return env
+
+
+def run_init(args, env):
+    result = subprocess.run(
+        [sys.executable] + args + ['-c', INIT_SCRIPT],
+        cwd=LAMBDA_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"lambda_function failed to initialize:\n{result.stderr[-2000:]}")
+    return result
+
+
+def cumulative_import_times(importtime_output):
+    # Returns {module: cumulative ms} from "import time: <self> | <cumulative> | <name>" lines,
+    # keeping the first import of each module, which is the one that paid for it
+    times = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times.setdefault(name.strip(), int(cumulative) / 1000)
+    return times
+
+
+def measure(provisioned=False):
+    env = lambda_environment(provisioned)
+
+    # -X importtime slows every import down, so it only provides the breakdown
+    init_ms = float(run_init([], env).stdout.strip().splitlines()[-1])
+    import_times = cumulative_import_times(run_init(['-X', 'importtime'], env).stderr)
+    return {
+        "init_ms": round(init_ms, 1),
+        "boto3_import_ms": round(import_times["boto3"], 1),
+        "fitz_import_ms": round(import_times["fitz"], 1),
+    }
+
+
+def fastest(runs, provisioned=False):
+    return min((measure(provisioned) for _ in range(runs)), key=lambda run: run["init_ms"])
+
+
+def budget_error(results, max_ms):
+    if results["init_ms"] > max_ms:
+        return f"Init phase took {results['init_ms']:.1f} ms, over the {max_ms:.1f} ms budget"
+    return None
+
+
+def current_commit():
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    return result.stdout.strip() or 'dev'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--release', help='label the results are recorded under, the current git commit by default')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to measure, the fastest is kept')
+    parser.add_argument('--provisioned', action='store_true',
+                        help='measure the init phase of a provisioned concurrency container, including its warm up')
+    parser.add_argument('--output', help='JSON file the results are appended to')
+    parser.add_argument('--max-ms', type=float, default=INIT_BUDGET_MS,
+                        help='fail if the init phase takes longer than this')
+    args = parser.parse_args()
+
+    missing = missing_modules()
+    if missing:
+        sys.exit(f"Cannot measure the cold start without {', '.join(missing)} installed")
+
+    results = fastest(args.runs, args.provisioned)
+    for name, milliseconds in results.items():
+        print(f"{name:<16} {milliseconds:.1f} ms")
+
+    if args.output:
+        history = {}
+        if os.path.exists(args.output):
+            with open(args.output) as f:
+                history = json.load(f)
+        history[args.release or current_commit()] = results
+        with open(args.output, 'w') as f:
+            json.dump(history, f, indent=2)
+            f.write('\n')
+
+    error = budget_error(results, args.max_ms)
+    if error:
+        sys.exit(error)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Measure per-page render cost of the enrichment Lambda function and derive its sizing.
+
+Renders every page of the PDFs in documents/ with the handler's own pdf_to_png,
+base64 encodes it the way process_image does, and records render time, PNG size
+and peak memory. From those numbers it derives the memorySize,
+ephemeralStorageSize and maxRenderedPages of the default profile in
+setup/enrichment_lambda_profile.py:
+
+- Lambda allocates CPU in proportion to memory, a full vCPU at 1769 MB. A local
+  core is taken as one vCPU, so a page that renders in t ms locally takes about
+  t * 1769 / memorySize ms on a smaller function.
+- memorySize is the smallest multiple of 128 MB that keeps twice the peak memory,
+  keeps the init phase (from benchmarks/import_time.py) within --init-budget-ms,
+  and renders a page faster than the pageConcurrency workers transcribe them, so
+  Bedrock calls never wait on rendering.
+- maxRenderedPages keeps two rounds of pages queued for the workers.
+- ephemeralStorageSize holds the PDF plus maxRenderedPages of the largest PNG
+  with a 2x margin, and is never below the 512 MB Lambda minimum.
+
+pageConcurrency is bound by the Bedrock request quota of the account and
+timeoutSeconds by the longest document, so neither is derived here. The
+benchmark runs on the build machine's architecture only.
+
+Usage:
+    python benchmarks/render_time.py --output benchmarks/render_time.json
+"""
+import argparse
+import base64
+import glob
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(PROJECT_DIR, 'setup', 'doc_enrichment_lambda')
+DOCUMENTS = os.path.join(PROJECT_DIR, 'documents', '*.pdf')
+
+LAMBDA_FULL_VCPU_MB = 1769
+LAMBDA_MIN_EPHEMERAL_MB = 512
+
+
+def measure_documents(pdf_to_png, fitz):
+    pages = []
+    with tempfile.TemporaryDirectory() as output_folder:
+        for pdf_file in sorted(glob.glob(DOCUMENTS)):
+            pdf_document = fitz.open(pdf_file)
+            for page_num in range(len(pdf_document)):
+                start = time.perf_counter()
+                png_file = pdf_to_png(pdf_document, output_folder, page_num)
+                with open(png_file, 'rb') as f:
+                    base64.b64encode(f.read())
+                pages.append({
+                    "document": os.path.basename(pdf_file),
+                    "page": page_num + 1,
+                    "render_ms": round((time.perf_counter() - start) * 1000, 1),
+                    "png_bytes": os.path.getsize(png_file),
+                })
+                os.remove(png_file)
+            pdf_document.close()
+    return pages
+
+
+def measure_init_ms():
+    # Reuse the import-time benchmark so both scripts agree on the init phase
+    result = subprocess.run(
+        [sys.executable, os.path.join(PROJECT_DIR, 'benchmarks', 'import_time.py'), '--runs', '3'],
+        stdout=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith('init_ms'):
+            return float(line.split()[1])
+    raise RuntimeError(f"Unexpected import_time.py output:\n{result.stdout}")
+
+
+def derive_profile(pages, init_ms, peak_rss_mb, pdf_mb, page_concurrency, transcribe_seconds, init_budget_ms):
+    render_ms = max(page["render_ms"] for page in pages)
+    png_mb = max(page["png_bytes"] for page in pages) / 2**20
+
+    # Memory at which a page renders within the time each worker spends per page in Bedrock,
+    # and at which the init phase fits its budget
+    render_budget_ms = transcribe_seconds * 1000 / page_concurrency
+    memory_for_render = LAMBDA_FULL_VCPU_MB * min(1, render_ms / render_budget_ms)
+    memory_for_init = LAMBDA_FULL_VCPU_MB * min(1, init_ms / init_budget_ms)
+    memory_size = max(2 * peak_rss_mb, memory_for_render, memory_for_init)
+
+    max_rendered_pages = 2 * page_concurrency
+    ephemeral_mb = 2 * (pdf_mb + max_rendered_pages * png_mb)
+
+    return {
+        "memorySize": int(math.ceil(memory_size / 128) * 128),
+        "ephemeralStorageSize": max(LAMBDA_MIN_EPHEMERAL_MB, int(math.ceil(ephemeral_mb))),
+        "maxRenderedPages": max_rendered_pages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--transcribe-seconds', type=float, default=10,
+                        help='Bedrock time to transcribe one page, from the function logs')
+    parser.add_argument('--init-budget-ms', type=float, default=1000,
+                        help='longest acceptable init phase on Lambda')
+    parser.add_argument('--output', help='JSON file the measurements and derived profile are written to')
+    args = parser.parse_args()
+
+    # Measure the handler's own rendering code with the Lambda environment it expects
+    os.environ.setdefault('AWS_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    os.environ['AWS_EC2_METADATA_DISABLED'] = 'true'
+    sys.path[:0] = [LAMBDA_DIR, PROJECT_DIR]
+    import lambda_function
+    from setup.enrichment_lambda_profile import ENRICHMENT_LAMBDA_PROFILE
+
+    pages = measure_documents(lambda_function.pdf_to_png, lambda_function.fitz)
+    if not pages:
+        sys.exit(f"No PDF documents found in {os.path.dirname(DOCUMENTS)}")
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    pdf_mb = max(os.path.getsize(pdf_file) for pdf_file in glob.glob(DOCUMENTS)) / 2**20
+    init_ms = measure_init_ms()
+
+    derived = derive_profile(pages, init_ms, peak_rss_mb, pdf_mb, ENRICHMENT_LAMBDA_PROFILE["pageConcurrency"],
+                             args.transcribe_seconds, args.init_budget_ms)
+
+    for page in pages:
+        print(f"{page['document']} page {page['page']:<4} {page['render_ms']:>8.1f} ms {page['png_bytes']:>10} bytes")
+    print(f"init phase       {init_ms:.1f} ms")
+    print(f"peak memory      {peak_rss_mb:.1f} MB")
+    for key, value in derived.items():
+        current = ENRICHMENT_LAMBDA_PROFILE[key]
+        marker = '' if value == current else f"  (profile has {current})"
+        print(f"{key:<22} {value}{marker}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                "machine": {"platform": sys.platform, "architecture": os.uname().machine},
+                "assumptions": {"transcribeSeconds": args.transcribe_seconds, "initBudgetMs": args.init_budget_ms},
+                "pages": pages,
+                "initMs": init_ms,
+                "peakRssMb": round(peak_rss_mb, 1),
+                "derivedProfile": derived,
+            }, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
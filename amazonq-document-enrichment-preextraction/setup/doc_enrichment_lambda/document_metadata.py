@@ -0,0 +1,114 @@
+import json
+import logging
+import math
+import re
+from datetime import datetime
+
+logger = logging.getLogger()
+
+# The metadata schema is a list of {"name": ..., "type": STRING|STRING_LIST|NUMBER|DATE, "description": ...}
+
+METADATA_PATTERN = re.compile(r"<metadata>(.*?)</metadata>", re.DOTALL)
+
+NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?")
+
+# Q stores NUMBER attributes as signed 64-bit longs
+MAX_LONG_VALUE = 2 ** 63 - 1
+
+
+# Function to build the prompt suffix asking for the configured metadata fields
+def metadata_instructions(schema):
+    if not schema:
+        return ''
+
+    fields = "\n".join(
+        f"    - {field['name']} ({field['type']}): {field['description']}"
+        for field in schema
+    )
+    return f'''
+
+After the transcription, output a <metadata></metadata> block containing a single JSON object with these keys:
+{fields}
+
+Use null for a key whose value does not appear on this page. Write dates as YYYY-MM-DD, amounts as plain numbers without currency symbols or separators, and STRING_LIST values as JSON arrays. Do not put anything other than the JSON object inside the block.'''
+
+
+# Function to split the model response into the transcription and the metadata fields
+def split_metadata(content_text):
+    match = METADATA_PATTERN.search(content_text)
+    if not match:
+        return content_text, {}
+
+    text = (content_text[:match.start()] + content_text[match.end():]).strip()
+    try:
+        fields = json.loads(match.group(1))
+    except ValueError:
+        logger.warning("Discarding unparseable metadata block: %s", match.group(1))
+        return text, {}
+
+    return text, fields if isinstance(fields, dict) else {}
+
+
+# Function to convert an extracted amount into a whole number, rejecting anything that is not plainly numeric
+def to_long(value):
+    if isinstance(value, bool):
+        raise ValueError(f"not a number: {value}")
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        text = str(value).strip().replace('$', '').replace(',', '')
+        match = NUMBER_PATTERN.fullmatch(text)
+        if not match:
+            raise ValueError(f"not a number: {value}")
+        number = float(text) if match.group(1) else int(text)
+
+    if isinstance(number, float) and not math.isfinite(number):
+        raise ValueError(f"not a finite number: {value}")
+    number = int(round(number))
+    if abs(number) > MAX_LONG_VALUE:
+        raise OverflowError(f"number out of range: {value}")
+    return number
+
+
+# Function to convert an extracted value into a Q document attribute value
+def to_attribute_value(field_type, value):
+    if field_type == 'STRING_LIST':
+        values = value if isinstance(value, list) else [value]
+        return {"stringListValue": [str(v).strip() for v in values if str(v).strip()]}
+    if field_type == 'NUMBER':
+        return {"longValue": to_long(value)}
+    if field_type == 'DATE':
+        date = datetime.strptime(str(value).strip()[:10], "%Y-%m-%d")
+        return {"dateValue": date.strftime("%Y-%m-%dT00:00:00Z")}
+    return {"stringValue": str(value).strip()}
+
+
+# Function to merge the per-page metadata fields into deduplicated metadata updates
+def merge_metadata(schema, page_fields):
+    merged = {}
+    for page_number, fields in page_fields:
+        for field in schema:
+            name = field['name']
+            value = fields.get(name)
+            if value is None or value == '' or value == []:
+                continue
+            try:
+                attribute_value = to_attribute_value(field['type'], value)
+            except (ValueError, OverflowError):
+                logger.warning("Skipping invalid %s value on page %s: %s", name, page_number, value)
+                continue
+
+            if name not in merged:
+                merged[name] = attribute_value
+            elif field['type'] == 'STRING_LIST':
+                values = merged[name]["stringListValue"]
+                values.extend(v for v in attribute_value["stringListValue"] if v not in values)
+            elif merged[name] != attribute_value:
+                logger.info("Keeping first %s value %s, ignoring %s from page %s",
+                            name, merged[name], attribute_value, page_number)
+
+    return [
+        {"name": name, "value": value}
+        for name, value in merged.items()
+        if value != {"stringListValue": []}
+    ]
@@ -2,17 +2,28 @@ import json
 import os
 import logging
 import base64
-import boto3
-import fitz  # PyMuPDF library for PDF processing
+import io
 import re
-import concurrent.futures
 import shutil
+import threading
+import time
 from urllib.parse import unquote
+from document_metadata import metadata_instructions, split_metadata, merge_metadata
+from transcript_manifest import page_objects_prefix, delete_stale_page_objects, build_manifest, manifest_to_markdown
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Init phase: import the heavy dependencies and create the clients once per container,
+# timed so that the cold start cost shows up in the logs. With provisioned concurrency
+# this runs before the container receives its first sync request.
+init_start = time.perf_counter()
+
+import boto3
+import concurrent.futures
+import fitz  # PyMuPDF library for PDF processing
+
 # Initialize S3 clients
 s3_client = boto3.client('s3',os.environ['AWS_REGION'])
 
@@ -23,30 +34,61 @@ bedrock_runtime = boto3.client(
 )
 
 
-def pdf_to_png(pdf_file, output_folder):
+def warm_up_rendering():
+    # Render a blank page so that PyMuPDF's rendering path is loaded before the first document
+    document = fitz.open()
+    document.new_page(width=72, height=72).get_pixmap(alpha=False)
+    document.close()
+
+
+# Provisioned containers are initialized ahead of time, so they can afford the extra warm up
+if os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+    warm_up_rendering()
+
+logger.info("Init completed in %.1f ms (%s)", (time.perf_counter() - init_start) * 1000,
+            os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE', 'on-demand'))
+
+
+# Structured fields extracted alongside the transcription, configured by the stack.
+# Each entry is {"name": ..., "type": STRING|STRING_LIST|NUMBER|DATE, "description": ...}
+METADATA_SCHEMA = json.loads(os.environ.get('METADATA_SCHEMA', '[]'))
+
+# Optional page manifest written next to the transcript: text (none), json or markdown
+OUTPUT_FORMAT = os.environ.get('OUTPUT_FORMAT', 'text').lower()
+
+# Upload each page's text as its own object so later stages can fetch a single page
+UPLOAD_PAGE_OBJECTS = os.environ.get('UPLOAD_PAGE_OBJECTS', 'false').lower() == 'true'
+
+
+def positive_int_env(name, default):
+    # A value below 1 would leave the page pipeline without a worker or a render slot
+    value = int(os.environ.get(name, default))
+    if value < 1:
+        raise ValueError(f"{name} must be at least 1, got {value}")
+    return value
+
+
+# Number of pages transcribed in parallel, sized by the stack's performance profile
+PAGE_CONCURRENCY = positive_int_env('PAGE_CONCURRENCY', '8')
+
+# Number of rendered pages kept in /tmp at a time, bounding memory and ephemeral storage use
+MAX_RENDERED_PAGES = positive_int_env('MAX_RENDERED_PAGES', '16')
+
+
+def pdf_to_png(pdf_document, output_folder, page_num):
     # Create output folder if it doesn't exist
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+    os.makedirs(output_folder, exist_ok=True)
     
-    # Open the PDF file
-    pdf_document = fitz.open(pdf_file)
+    # Get the page
+    page = pdf_document.load_page(page_num)
     
-    # Iterate through each page
-    for page_num in range(len(pdf_document)):
-        # Get the page
-        page = pdf_document.load_page(page_num)
-        
-        # Render the page as an image
-        pix = page.get_pixmap(alpha=False)
-        
-        # Save the image as PNG
-        pix.save(os.path.join(output_folder, f"page_{page_num+1}.png"))
-
-    # Close the PDF document
-    pdf_document.close()
-
-    # Cleanup: Delete PDF file after conversion
-    os.remove(pdf_file)
+    # Render the page as an image
+    pix = page.get_pixmap(alpha=False)
+    
+    # Save the image as PNG
+    png_file = os.path.join(output_folder, f"page_{page_num+1}.png")
+    pix.save(png_file)
+    return png_file
 
 
 # Function to extract the numeric part of the filename
@@ -134,7 +176,7 @@ Figure 3: This chart shows annual sales in millions. The year 2020 was significa
 | Investing activities | (58,154) | (37,601) |
 | Financing activities | 6,291 | 9,718 |
 
-Here is the image.'''
+Here is the image.''' + metadata_instructions(METADATA_SCHEMA)
                             
                             
                         },
@@ -155,10 +197,18 @@ Here is the image.'''
     # Process the response (replace this with actual processing of response)
     logger.info("Data : %s", response_body)
 
-    # Return the processed text
-    content_text = response_body["content"][0]["text"]
-    return page_number, content_text
+    # Return the processed text along with any metadata fields found on the page
+    content_text, fields = split_metadata(response_body["content"][0]["text"])
+    return page_number, content_text, fields
+
 
+# Function to process a rendered page and free its slot once the PNG file is deleted
+def process_rendered_image(image_path, rendered_pages):
+    try:
+        return process_image(image_path)
+    finally:
+        os.remove(image_path)
+        rendered_pages.release()
 
 
 def lambda_handler(event, context):
@@ -183,48 +233,82 @@ def lambda_handler(event, context):
     # Output folder for PNG files
     output_folder = f'/tmp/png-output-{context.aws_request_id}/'
     
-    # Convert the PDF to PNG files
-    pdf_to_png(pdf_file, output_folder)
-    
-    # Output text file path
-    output_file_path = f'/tmp/output-text-file-{context.aws_request_id}.txt'
+    # Open the PDF file
+    pdf_document = fitz.open(pdf_file)
+    page_count = len(pdf_document)
+
+    # Convert the PDF to PNG files and submit each page as soon as it is rendered,
+    # keeping at most MAX_RENDERED_PAGES rendered pages on disk
+    rendered_pages = threading.BoundedSemaphore(MAX_RENDERED_PAGES)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PAGE_CONCURRENCY) as executor:
+        page_results = []
+        for page_num in range(page_count):
+            rendered_pages.acquire()
+            png_file = pdf_to_png(pdf_document, output_folder, page_num)
+            page_results.append(executor.submit(process_rendered_image, png_file, rendered_pages))
 
-    # Process each PNG file in the folder
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        # Get a list of PNG file paths
-        png_files = [os.path.join(output_folder, filename) for filename in os.listdir(output_folder) if filename.endswith(".png")]
+        # Gather results
+        results = [page_result.result() for page_result in page_results]
 
-        # Process images and gather results
-        results = executor.map(process_image, png_files)
+        # Close the PDF document
+        pdf_document.close()
+
+        # Cleanup: Delete PDF file after conversion
+        os.remove(pdf_file)
 
         # Sort results by page number
         sorted_results = sorted(results, key=lambda x: x[0])
 
-        # Write output to text file
-        with open(output_file_path, "a") as text_file:
-            for page_number, content_text in sorted_results:
-                text_file.write(f"Page Number: {page_number}\n")
-                formatted_text = "\n".join(line.strip() for line in content_text.split("\n"))
-                text_file.write(formatted_text + "\n\n")
-
-    # Upload the output text file to the target S3 bucket
-    target_key = f"pre-extraction/{source_key}.txt"
-    # target_key = source_key + '.txt'
-    print("target_key is :"+target_key)
-    
-    # s3_client.upload_file(output_file_path, target_bucket, target_key)
-    s3_client.upload_file(output_file_path, source_bucket, target_key)
+        # Merge the structured fields extracted from each page
+        page_fields = [(page_number, fields) for page_number, _, fields in sorted_results]
+        metadata_updates = merge_metadata(METADATA_SCHEMA, page_fields)
+        logger.info("Metadata updates: %s", metadata_updates)
+
+        # Upload the output text file to the target S3 bucket
+        target_key = f"pre-extraction/{source_key}.txt"
+        print("target_key is :"+target_key)
+
+        # Build the transcript and its page manifest in memory and upload it in a single stream
+        transcript, manifest = build_manifest(source_key, target_key, sorted_results,
+                                              with_page_objects=UPLOAD_PAGE_OBJECTS)
+        s3_client.upload_fileobj(io.BytesIO(transcript), source_bucket, target_key)
+
+        # Upload the page objects in parallel, the manifest is the record of which pages are current
+        if UPLOAD_PAGE_OBJECTS:
+            page_uploads = [
+                executor.submit(s3_client.put_object,
+                                Bucket=source_bucket,
+                                Key=page["s3ObjectKey"],
+                                Body=transcript[page["offset"]:page["offset"] + page["length"]])
+                for page in manifest["pages"]
+            ]
+            for page_upload in page_uploads:
+                page_upload.result()
+
+    # Remove page objects that are not part of this version of the document
+    if UPLOAD_PAGE_OBJECTS:
+        current_keys = {page["s3ObjectKey"] for page in manifest["pages"]}
+        delete_stale_page_objects(s3_client, source_bucket, page_objects_prefix(source_key), current_keys)
+
+    if OUTPUT_FORMAT == 'json':
+        s3_client.put_object(Bucket=source_bucket,
+                             Key=f"pre-extraction/{source_key}.manifest.json",
+                             Body=json.dumps(manifest, indent=2).encode('utf-8'))
+    elif OUTPUT_FORMAT == 'markdown':
+        s3_client.put_object(Bucket=source_bucket,
+                             Key=f"pre-extraction/{source_key}.manifest.md",
+                             Body=manifest_to_markdown(manifest).encode('utf-8'))
 
     logger.info("Processing completed.")
     
     # Cleanup: Delete PNG files after processing
-    shutil.rmtree(output_folder)
+    shutil.rmtree(output_folder, ignore_errors=True)
 
     return {
         # 'statusCode': 200,
         # 'body': json.dumps('Hello from Lambda!')
         "version": "v0",
         "s3ObjectKey": target_key,
-        "metadataUpdates": []
+        "metadataUpdates": metadata_updates
     }
  
\ No newline at end of file
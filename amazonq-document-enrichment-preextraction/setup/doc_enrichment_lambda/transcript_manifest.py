@@ -0,0 +1,68 @@
+import hashlib
+import io
+
+
+# Function to get the prefix under which the page objects of a document are uploaded
+def page_objects_prefix(source_key):
+    return f"pre-extraction/{source_key}.pages/"
+
+
+# Function to delete page objects left over from an earlier, longer version of the document
+def delete_stale_page_objects(s3_client, bucket, prefix, current_keys):
+    paginator = s3_client.get_paginator('list_objects_v2')
+    stale_objects = [
+        {"Key": s3_object["Key"]}
+        for response in paginator.paginate(Bucket=bucket, Prefix=prefix)
+        for s3_object in response.get("Contents", [])
+        if s3_object["Key"] not in current_keys
+    ]
+    # DeleteObjects accepts at most 1000 keys per request
+    for start in range(0, len(stale_objects), 1000):
+        s3_client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": stale_objects[start:start + 1000], "Quiet": True}
+        )
+
+
+# Function to build the transcript and a manifest of its page boundaries
+def build_manifest(source_key, target_key, sorted_results, with_page_objects=False):
+    transcript = io.BytesIO()
+    pages = []
+    for page_number, content_text, _ in sorted_results:
+        formatted_text = "\n".join(line.strip() for line in content_text.split("\n"))
+        page_text = f"Page Number: {page_number}\n{formatted_text}\n\n".encode('utf-8')
+        page = {
+            "pageNumber": page_number,
+            "offset": transcript.tell(),
+            "length": len(page_text),
+            "sha256": hashlib.sha256(page_text).hexdigest()
+        }
+        if with_page_objects:
+            page["s3ObjectKey"] = f"{page_objects_prefix(source_key)}page_{page_number}.txt"
+        pages.append(page)
+        transcript.write(page_text)
+
+    manifest = {
+        "sourceKey": source_key,
+        "s3ObjectKey": target_key,
+        "pageCount": len(pages),
+        "pages": pages
+    }
+    return transcript.getvalue(), manifest
+
+
+# Function to render the page manifest as a Markdown table
+def manifest_to_markdown(manifest):
+    lines = [
+        f"# {manifest['sourceKey']}",
+        "",
+        f"Transcript: `{manifest['s3ObjectKey']}` ({manifest['pageCount']} pages)",
+        "",
+        "| Page | Byte Range | SHA-256 | Page Object |",
+        "|-|-|-|-|",
+    ]
+    for page in manifest["pages"]:
+        byte_range = f"{page['offset']}-{page['offset'] + page['length'] - 1}"
+        page_key = page.get("s3ObjectKey", " ")
+        lines.append(f"| {page['pageNumber']} | {byte_range} | {page['sha256']} | {page_key} |")
+    return "\n".join(lines) + "\n"
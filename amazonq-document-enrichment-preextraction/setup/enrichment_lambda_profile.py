@@ -0,0 +1,48 @@
+# Default sizing of the enrichment lambda. This is the only copy of the defaults;
+# set the "enrichmentLambdaProfile" CDK context value to override them key by key.
+# memorySize, ephemeralStorageSize and maxRenderedPages are derived by
+# benchmarks/render_time.py from the sample document in documents/ (results in
+# benchmarks/render_time.json); pageConcurrency and timeoutSeconds are not measured.
+ENRICHMENT_LAMBDA_PROFILE = {
+    "memorySize": 1024,
+    "architecture": "X86_64",
+    "ephemeralStorageSize": 512,
+    "timeoutSeconds": 300,
+    "reservedConcurrency": None,
+    "provisionedConcurrency": 0,
+    "pageConcurrency": 8,
+    "maxRenderedPages": 16
+}
+
+ARCHITECTURES = ("X86_64", "ARM_64")
+
+POSITIVE_INT_KEYS = ("memorySize", "ephemeralStorageSize", "timeoutSeconds", "pageConcurrency", "maxRenderedPages")
+
+
+def is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def merge_enrichment_lambda_profile(context_profile: dict) -> dict:
+    # merge a context profile over the default profile and validate the result
+    unknown_keys = set(context_profile) - set(ENRICHMENT_LAMBDA_PROFILE)
+    if unknown_keys:
+        raise ValueError(f"Unknown enrichmentLambdaProfile keys: {sorted(unknown_keys)}")
+
+    profile = {**ENRICHMENT_LAMBDA_PROFILE, **context_profile}
+
+    if profile["architecture"] not in ARCHITECTURES:
+        raise ValueError(f"enrichmentLambdaProfile architecture must be one of {ARCHITECTURES}, "
+                         f"got {profile['architecture']!r}")
+    for key in POSITIVE_INT_KEYS:
+        if not is_int(profile[key]) or profile[key] < 1:
+            raise ValueError(f"enrichmentLambdaProfile {key} must be a positive integer, got {profile[key]!r}")
+    if profile["reservedConcurrency"] is not None and (
+            not is_int(profile["reservedConcurrency"]) or profile["reservedConcurrency"] < 0):
+        raise ValueError(f"enrichmentLambdaProfile reservedConcurrency must be null or a non-negative integer, "
+                         f"got {profile['reservedConcurrency']!r}")
+    if not is_int(profile["provisionedConcurrency"]) or profile["provisionedConcurrency"] < 0:
+        raise ValueError(f"enrichmentLambdaProfile provisionedConcurrency must be a non-negative integer, "
+                         f"got {profile['provisionedConcurrency']!r}")
+
+    return profile
@@ -0,0 +1,35 @@
+import logging
+import boto3
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+qbusiness_client = boto3.client('qbusiness')
+
+
+def on_event(event, context):
+    # Nothing to create or delete, the waiting happens in is_complete
+    properties = event["ResourceProperties"]
+    return {
+        "PhysicalResourceId": f"{properties['applicationId']}/{properties['indexId']}"
+    }
+
+
+def is_complete(event, context):
+    # Poll the index until it is ACTIVE so that it can be updated
+    if event["RequestType"] == "Delete":
+        return {"IsComplete": True}
+
+    properties = event["ResourceProperties"]
+    index = qbusiness_client.get_index(
+        applicationId=properties["applicationId"],
+        indexId=properties["indexId"]
+    )
+    status = index["status"]
+    logger.info("Index %s status is %s", properties["indexId"], status)
+
+    if status == "FAILED":
+        raise RuntimeError(f"Index {properties['indexId']} failed: {index.get('error')}")
+
+    return {"IsComplete": status == "ACTIVE"}
@@ -0,0 +1,123 @@
+"""Build a size-trimmed PyMuPDF Lambda layer as setup/layers/pyMuPDF-layer.zip.
+
+Usage:
+    python setup/layers/build_pymupdf_layer.py --architecture X86_64
+
+The architecture must match the "architecture" of the enrichment lambda profile:
+ENRICHMENT_LAMBDA_PROFILE in setup/enrichment_lambda_profile.py, or its override
+in the "enrichmentLambdaProfile" context value in cdk.json.
+"""
+import argparse
+import fnmatch
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+LAYER_ZIP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pyMuPDF-layer.zip')
+
+PLATFORMS = {
+    "X86_64": "manylinux2014_x86_64",
+    "ARM_64": "manylinux2014_aarch64",
+}
+
+# Files and directories the Lambda function never loads at runtime
+PRUNE_PATTERNS = [
+    "__pycache__",
+    "*.dist-info",
+    "*.pyi",
+    "*.h",
+    "*.a",
+    "*.lib",
+    "include",
+    "mupdf-devel",
+    "tests",
+]
+
+
+def install(target, architecture, python_version, pymupdf_version):
+    # Install the manylinux wheels for the Lambda runtime, whatever platform we build on
+    subprocess.check_call([
+        sys.executable, '-m', 'pip', 'install',
+        f'PyMuPDF=={pymupdf_version}',
+        '--target', target,
+        '--platform', PLATFORMS[architecture],
+        '--implementation', 'cp',
+        '--python-version', python_version,
+        '--only-binary=:all:',
+        '--no-compile',
+        '--quiet',
+    ])
+
+
+def prune(target):
+    for root, dirs, files in os.walk(target, topdown=True):
+        for name in list(dirs):
+            if any(fnmatch.fnmatch(name, pattern) for pattern in PRUNE_PATTERNS):
+                shutil.rmtree(os.path.join(root, name))
+                dirs.remove(name)
+        for name in files:
+            if any(fnmatch.fnmatch(name, pattern) for pattern in PRUNE_PATTERNS):
+                os.remove(os.path.join(root, name))
+
+
+def strip_shared_libraries(target):
+    # Drop debug symbols from the native libraries when a strip for the target is available
+    strip = shutil.which('strip')
+    if not strip:
+        print("strip not found, shared libraries are left as is")
+        return
+
+    for root, _, files in os.walk(target):
+        for name in files:
+            if '.so' in name:
+                result = subprocess.run([strip, '--strip-unneeded', os.path.join(root, name)],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                if result.returncode != 0:
+                    print(f"Could not strip {name}, leaving it as is")
+
+
+def directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--architecture', choices=sorted(PLATFORMS), default='X86_64')
+    parser.add_argument('--python-version', default='3.12')
+    parser.add_argument('--pymupdf-version', default='1.24.9')
+    parser.add_argument('--output', default=LAYER_ZIP)
+    args = parser.parse_args()
+
+    build_dir = tempfile.mkdtemp(prefix='pymupdf-layer-')
+    try:
+        # Lambda layers expose python/ on the sys.path of Python runtimes
+        target = os.path.join(build_dir, 'python')
+        install(target, args.architecture, args.python_version, args.pymupdf_version)
+        installed_size = directory_size(target)
+
+        prune(target)
+        strip_shared_libraries(target)
+        trimmed_size = directory_size(target)
+
+        with zipfile.ZipFile(args.output, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as layer_zip:
+            for root, _, files in os.walk(target):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    layer_zip.write(path, os.path.relpath(path, build_dir))
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    print(f"Installed size: {installed_size / 2**20:.1f} MiB")
+    print(f"Trimmed size:   {trimmed_size / 2**20:.1f} MiB")
+    print(f"Layer zip:      {os.path.getsize(args.output) / 2**20:.1f} MiB -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Structured fields the enrichment lambda extracts from each page and returns as metadataUpdates
+METADATA_SCHEMA = [
+    {
+        "name": "claim_number",
+        "type": "STRING",
+        "description": "The insurance claim number referenced in the letter"
+    },
+    {
+        "name": "date_of_loss",
+        "type": "DATE",
+        "description": "The date the accident or loss occurred"
+    },
+    {
+        "name": "claimant_names",
+        "type": "STRING_LIST",
+        "description": "Full names of the claimants seeking compensation"
+    },
+    {
+        "name": "demand_amount",
+        "type": "NUMBER",
+        "description": "The total compensation amount demanded, in whole dollars"
+    }
+]
+
+# The S3 connector template names index attribute types differently from the index itself
+FIELD_MAPPING_TYPES = {
+    "STRING": "STRING",
+    "STRING_LIST": "STRING_LIST",
+    "NUMBER": "LONG",
+    "DATE": "DATE"
+}
+# Format of the dateValue the enrichment lambda returns for DATE fields
+FIELD_MAPPING_DATE_FORMAT = "yyyy-MM-dd'T'HH:mm:ss'Z'"
+
+
+def field_mapping(field: dict) -> dict:
+    # map a METADATA_SCHEMA field to an S3 connector template fieldMappings entry
+    mapping = {
+        "indexFieldName": field["name"],
+        "indexFieldType": FIELD_MAPPING_TYPES[field["type"]],
+        "dataSourceFieldName": field["name"]
+    }
+    if field["type"] == "DATE":
+        mapping["dateFieldFormat"] = FIELD_MAPPING_DATE_FORMAT
+    return mapping
+
+
+def index_attribute_configuration(field: dict) -> dict:
+    # map a METADATA_SCHEMA field to an UpdateIndex documentAttributeConfigurations entry
+    return {
+        "name": field["name"],
+        "type": field["type"],
+        "search": "ENABLED"
+    }
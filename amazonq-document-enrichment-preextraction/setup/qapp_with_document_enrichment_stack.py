@@ -1,3 +1,4 @@
+import json
 import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import (
@@ -9,6 +10,8 @@ from aws_cdk import (
     aws_iam as iam,
     custom_resources as cr,
 )
+from setup.enrichment_lambda_profile import merge_enrichment_lambda_profile
+from setup.metadata_schema import METADATA_SCHEMA, field_mapping, index_attribute_configuration
 
 REGION = cdk.Aws.REGION
 ACCOUNT_ID = cdk.Aws.ACCOUNT_ID
@@ -17,6 +20,12 @@ Q_APPLICATION_DESCRIPTION = "Application configured with an S3 data source that
 Q_APPLICATION_WELCOME_MESSAGE = "In this demo, PDFs with text images will be indexed"
 DATASOURCE_NAME = "demandletter-s3-data-source-12345"
 DATASOURCE_DESCRIPTION = "demandletter-s3-data-source"
+# Runtime of every lambda in the stack; the PyMuPDF layer must be built for the same Python version
+LAMBDA_RUNTIME = _lambda.Runtime.PYTHON_3_12
+# Page manifest written next to each transcript: "text" (none), "json" or "markdown"
+TRANSCRIPT_MANIFEST_FORMAT = "json"
+# Also upload every page's text as a separate object under pre-extraction/
+UPLOAD_PAGE_OBJECTS = False
 
 class QAppWithDocumentEnrichmentStack(Stack):
 
@@ -51,10 +60,14 @@ class QAppWithDocumentEnrichmentStack(Stack):
         # create enrichment lambda
         # grant data bucket access and textract
         
+        profile = self.enrichment_lambda_profile()
+        architecture = _lambda.Architecture.ARM_64 if profile["architecture"] == "ARM_64" else _lambda.Architecture.X86_64
+
         pyMuPDF_lambda_layer = _lambda.LayerVersion(
                self, 'pyMuPDFLambdaLayer',
                code=_lambda.Code.from_asset('setup/layers/pyMuPDF-layer.zip'),
-               compatible_runtimes=[_lambda.Runtime.PYTHON_3_8],
+               compatible_runtimes=[LAMBDA_RUNTIME],
+               compatible_architectures=[architecture],
                description='pyMuPDF Library',
                layer_version_name='pyMuPDFLambdaLayer'
            )
@@ -62,13 +75,29 @@ class QAppWithDocumentEnrichmentStack(Stack):
         enrichment_lambda = _lambda.Function(
             self,
             "QEnrichmentLambda",
-            runtime=_lambda.Runtime.PYTHON_3_8,
+            runtime=LAMBDA_RUNTIME,
             handler="lambda_function.lambda_handler",
             code=_lambda.Code.from_asset(
                 'setup/doc_enrichment_lambda'
             ),
             layers=[pyMuPDF_lambda_layer],
-            timeout=Duration.seconds(60),
+            architecture=architecture,
+            memory_size=profile["memorySize"],
+            ephemeral_storage_size=cdk.Size.mebibytes(profile["ephemeralStorageSize"]),
+            timeout=Duration.seconds(profile["timeoutSeconds"]),
+            reserved_concurrent_executions=profile["reservedConcurrency"],
+            environment={
+                "METADATA_SCHEMA": json.dumps(METADATA_SCHEMA),
+                "OUTPUT_FORMAT": TRANSCRIPT_MANIFEST_FORMAT,
+                "UPLOAD_PAGE_OBJECTS": str(UPLOAD_PAGE_OBJECTS).lower(),
+                "PAGE_CONCURRENCY": str(profile["pageConcurrency"]),
+                "MAX_RENDERED_PAGES": str(profile["maxRenderedPages"])
+            },
+        )
+        # the data source invokes the alias so provisioned concurrency can keep it warm during syncs
+        enrichment_lambda_alias = enrichment_lambda.add_alias(
+            "live",
+            provisioned_concurrent_executions=profile["provisionedConcurrency"] or None
         )
         enrichment_lambda.role.add_to_principal_policy(
             iam.PolicyStatement(
@@ -240,6 +269,81 @@ class QAppWithDocumentEnrichmentStack(Stack):
         index_id = index_res.get_response_field('indexId')
         index_res.node.add_dependency(q_application_res)
 
+        # wait for the index to become ACTIVE, CreateIndex returns while it is still CREATING
+        index_waiter_lambda = _lambda.Function(
+            self,
+            "QIndexWaiterLambda",
+            runtime=LAMBDA_RUNTIME,
+            handler="lambda_function.on_event",
+            code=_lambda.Code.from_asset(
+                'setup/index_waiter_lambda'
+            ),
+            timeout=Duration.seconds(60),
+        )
+        index_waiter_complete_lambda = _lambda.Function(
+            self,
+            "QIndexWaiterCompleteLambda",
+            runtime=LAMBDA_RUNTIME,
+            handler="lambda_function.is_complete",
+            code=_lambda.Code.from_asset(
+                'setup/index_waiter_lambda'
+            ),
+            timeout=Duration.seconds(60),
+        )
+        index_waiter_complete_lambda.role.add_to_principal_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "qbusiness:GetIndex"
+                ],
+                resources=[
+                    f"arn:aws:qbusiness:{REGION}:{ACCOUNT_ID}:application/*/index/*"
+                ]
+            )
+        )
+        index_waiter_provider = cr.Provider(
+            self,
+            "QIndexWaiterProvider",
+            on_event_handler=index_waiter_lambda,
+            is_complete_handler=index_waiter_complete_lambda,
+            query_interval=Duration.seconds(30),
+            total_timeout=Duration.minutes(30),
+        )
+        index_active_res = cdk.CustomResource(
+            self,
+            'QApplicationIndexActive',
+            service_token=index_waiter_provider.service_token,
+            properties={
+                "applicationId": q_application_id,
+                "indexId": index_id
+            }
+        )
+
+        # declare the extracted metadata fields as searchable index attributes
+        # and update them whenever METADATA_SCHEMA changes
+        update_index_attributes = cr.AwsSdkCall(
+            service='@aws-sdk/client-qbusiness',
+            action='UpdateIndex',
+            parameters={
+                "applicationId": q_application_id,
+                "indexId": index_id,
+                "documentAttributeConfigurations": [
+                    index_attribute_configuration(field)
+                    for field in METADATA_SCHEMA
+                ]
+            },
+            physical_resource_id=cr.PhysicalResourceId.of("QApplicationIndexAttributes")
+        )
+        index_attributes_res = cr.AwsCustomResource(
+            self,
+            'QApplicationIndexAttributes',
+            timeout= Duration.minutes(10),
+            install_latest_aws_sdk=True,
+            role=custom_res_role,
+            on_create=update_index_attributes,
+            on_update=update_index_attributes
+        )
+        index_attributes_res.node.add_dependency(index_active_res)
+
         # create retriever
         retriever_res = cr.AwsCustomResource(
             self,
@@ -434,7 +538,7 @@ class QAppWithDocumentEnrichmentStack(Stack):
         )
 
         # create datasource
-        cr.AwsCustomResource(
+        datasource_res = cr.AwsCustomResource(
             self,
             'DataSource',
             timeout= Duration.minutes(10),
@@ -462,6 +566,9 @@ class QAppWithDocumentEnrichmentStack(Stack):
                                         "indexFieldType": "STRING",
                                         "dataSourceFieldName": "s3_document_id"
                                     }
+                                ] + [
+                                    field_mapping(field)
+                                    for field in METADATA_SCHEMA
                                 ]
                             }
                         },
@@ -478,7 +585,7 @@ class QAppWithDocumentEnrichmentStack(Stack):
                         },
                         "documentEnrichmentConfiguration": {
                             "preExtractionHookConfiguration": {
-                                "lambdaArn": enrichment_lambda.function_arn,
+                                "lambdaArn": enrichment_lambda_alias.function_arn,
                                 "roleArn": datasource_role.role_arn,
                                 's3BucketName': data_bucket.bucket_name
                             }
@@ -498,3 +605,14 @@ class QAppWithDocumentEnrichmentStack(Stack):
                     }
                 )
             )
+
+        datasource_res.node.add_dependency(index_attributes_res)
+
+    def enrichment_lambda_profile(self) -> dict:
+        # merge the "enrichmentLambdaProfile" context value over the default profile
+        context_profile = self.node.try_get_context("enrichmentLambdaProfile") or {}
+        if isinstance(context_profile, str):
+            # values passed with `cdk deploy -c` arrive as JSON strings
+            context_profile = json.loads(context_profile)
+
+        return merge_enrichment_lambda_profile(context_profile)
@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks import import_time
+
+requires_dependencies = pytest.mark.skipif(
+    bool(import_time.missing_modules()),
+    reason="boto3 and PyMuPDF are required to measure the cold start"
+)
+
+
+@requires_dependencies
+def test_init_phase_is_within_budget():
+    results = import_time.fastest(runs=3)
+    assert import_time.budget_error(results, import_time.INIT_BUDGET_MS) is None
+
+
+@requires_dependencies
+def test_init_phase_imports_boto3_and_fitz():
+    results = import_time.measure()
+    assert results["boto3_import_ms"] > 0
+    assert results["fitz_import_ms"] > 0
+
+
+def test_budget_error():
+    assert import_time.budget_error({"init_ms": 999.9}, 1000) is None
+    assert "over the 1000.0 ms budget" in import_time.budget_error({"init_ms": 1000.1}, 1000)
@@ -0,0 +1,35 @@
+from benchmarks import render_time
+
+PAGES = [
+    {"document": "a.pdf", "page": 1, "render_ms": 60.0, "png_bytes": 400 * 2**10},
+    {"document": "a.pdf", "page": 2, "render_ms": 40.0, "png_bytes": 100 * 2**10},
+]
+
+
+def derive(**overrides):
+    arguments = dict(pages=PAGES, init_ms=500.0, peak_rss_mb=100.0, pdf_mb=1.0, page_concurrency=8,
+                     transcribe_seconds=10, init_budget_ms=1000)
+    arguments.update(overrides)
+    return render_time.derive_profile(**arguments)
+
+
+def test_derive_profile_sizes_memory_for_the_init_budget():
+    # 1769 MB * 500 / 1000 ms, rounded up to a multiple of 128 MB
+    assert derive()["memorySize"] == 896
+
+
+def test_derive_profile_sizes_memory_for_rendering_ahead_of_transcription():
+    # 8 workers transcribing a page in 1 s each need a page rendered every 125 ms
+    assert derive(transcribe_seconds=1)["memorySize"] == 896
+    assert derive(transcribe_seconds=0.5)["memorySize"] == 1792
+
+
+def test_derive_profile_keeps_twice_the_peak_memory():
+    assert derive(peak_rss_mb=600.0)["memorySize"] == 1280
+
+
+def test_derive_profile_storage_and_rendered_pages():
+    assert derive()["maxRenderedPages"] == 16
+    assert derive()["ephemeralStorageSize"] == render_time.LAMBDA_MIN_EPHEMERAL_MB
+    # 2 * (1 MB + 16 pages * 40 MB)
+    assert derive(pages=[dict(PAGES[0], png_bytes=40 * 2**20)])["ephemeralStorageSize"] == 1282
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The enrichment lambda is deployed from its own asset directory, where its modules are top level
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'setup', 'doc_enrichment_lambda'))
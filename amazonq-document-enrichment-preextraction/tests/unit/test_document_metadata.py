@@ -0,0 +1,85 @@
+import pytest
+
+from document_metadata import metadata_instructions, split_metadata, to_attribute_value, merge_metadata
+
+SCHEMA = [
+    {"name": "claim_number", "type": "STRING", "description": "Claim number"},
+    {"name": "date_of_loss", "type": "DATE", "description": "Date of loss"},
+    {"name": "claimant_names", "type": "STRING_LIST", "description": "Claimants"},
+    {"name": "demand_amount", "type": "NUMBER", "description": "Amount demanded"},
+]
+
+
+def test_metadata_instructions_lists_fields():
+    instructions = metadata_instructions(SCHEMA)
+    assert "<metadata></metadata>" in instructions
+    assert "- demand_amount (NUMBER): Amount demanded" in instructions
+
+
+def test_metadata_instructions_empty_without_schema():
+    assert metadata_instructions([]) == ''
+
+
+def test_split_metadata_removes_block():
+    text, fields = split_metadata('# Letter\nBody\n<metadata>{"claim_number": "C-1"}</metadata>')
+    assert text == "# Letter\nBody"
+    assert fields == {"claim_number": "C-1"}
+
+
+def test_split_metadata_without_block():
+    assert split_metadata("Body") == ("Body", {})
+
+
+@pytest.mark.parametrize("block", ["{not json", "[1, 2]"])
+def test_split_metadata_discards_invalid_block(block):
+    assert split_metadata(f"Body\n<metadata>{block}</metadata>") == ("Body", {})
+
+
+@pytest.mark.parametrize("value, expected", [
+    (25000, 25000),
+    (1234.6, 1235),
+    ("$25,000.00", 25000),
+    (" -12 ", -12),
+])
+def test_number_values(value, expected):
+    assert to_attribute_value("NUMBER", value) == {"longValue": expected}
+
+
+@pytest.mark.parametrize("value", ["1.2 million", "USD 5k", "", "1e5", True, float("inf")])
+def test_number_rejects_non_numeric_values(value):
+    with pytest.raises(ValueError):
+        to_attribute_value("NUMBER", value)
+
+
+def test_number_rejects_out_of_range_values():
+    with pytest.raises(OverflowError):
+        to_attribute_value("NUMBER", "9" * 400)
+
+
+def test_date_values():
+    assert to_attribute_value("DATE", "2024-01-05") == {"dateValue": "2024-01-05T00:00:00Z"}
+    with pytest.raises(ValueError):
+        to_attribute_value("DATE", "January 5th")
+
+
+def test_merge_keeps_first_value_and_deduplicates_lists():
+    updates = merge_metadata(SCHEMA, [
+        (1, {"claim_number": "C-1", "claimant_names": ["Jane Doe", "John Doe"], "demand_amount": "$25,000"}),
+        (2, {"claim_number": "C-2", "claimant_names": ["John Doe", "Ann Roe"], "date_of_loss": "2024-01-05"}),
+        (3, {}),
+    ])
+    assert updates == [
+        {"name": "claim_number", "value": {"stringValue": "C-1"}},
+        {"name": "claimant_names", "value": {"stringListValue": ["Jane Doe", "John Doe", "Ann Roe"]}},
+        {"name": "demand_amount", "value": {"longValue": 25000}},
+        {"name": "date_of_loss", "value": {"dateValue": "2024-01-05T00:00:00Z"}},
+    ]
+
+
+def test_merge_skips_invalid_and_empty_values():
+    updates = merge_metadata(SCHEMA, [
+        (1, {"claim_number": "", "date_of_loss": "unknown", "claimant_names": [" "], "demand_amount": "9" * 400}),
+        (2, {"claim_number": None, "demand_amount": "1.2 million"}),
+        (3, {"demand_amount": 500}),
+    ])
+    assert updates == [{"name": "demand_amount", "value": {"longValue": 500}}]
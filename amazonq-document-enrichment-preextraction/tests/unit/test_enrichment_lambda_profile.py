@@ -0,0 +1,50 @@
+import pytest
+
+from setup.enrichment_lambda_profile import ENRICHMENT_LAMBDA_PROFILE, merge_enrichment_lambda_profile
+
+
+def test_defaults_without_overrides():
+    assert merge_enrichment_lambda_profile({}) == ENRICHMENT_LAMBDA_PROFILE
+
+
+def test_overrides_are_merged_key_by_key():
+    profile = merge_enrichment_lambda_profile({"architecture": "ARM_64", "provisionedConcurrency": 2})
+    assert profile["architecture"] == "ARM_64"
+    assert profile["provisionedConcurrency"] == 2
+    assert profile["memorySize"] == ENRICHMENT_LAMBDA_PROFILE["memorySize"]
+
+
+def test_unknown_keys_are_rejected():
+    with pytest.raises(ValueError, match="pageBatchSize"):
+        merge_enrichment_lambda_profile({"pageBatchSize": 16})
+
+
+@pytest.mark.parametrize("architecture", ["ARM64", "arm64", "x86", None])
+def test_unknown_architectures_are_rejected(architecture):
+    with pytest.raises(ValueError, match="architecture"):
+        merge_enrichment_lambda_profile({"architecture": architecture})
+
+
+@pytest.mark.parametrize("key", ["memorySize", "ephemeralStorageSize", "timeoutSeconds",
+                                 "pageConcurrency", "maxRenderedPages"])
+@pytest.mark.parametrize("value", [0, -1, 1.5, "16", True, None])
+def test_sizes_must_be_positive_integers(key, value):
+    with pytest.raises(ValueError, match=key):
+        merge_enrichment_lambda_profile({key: value})
+
+
+@pytest.mark.parametrize("key, value", [
+    ("reservedConcurrency", -1),
+    ("reservedConcurrency", "10"),
+    ("provisionedConcurrency", -1),
+    ("provisionedConcurrency", None),
+])
+def test_concurrency_must_be_non_negative_integers(key, value):
+    with pytest.raises(ValueError, match=key):
+        merge_enrichment_lambda_profile({key: value})
+
+
+def test_concurrency_may_be_zero_or_unset():
+    profile = merge_enrichment_lambda_profile({"reservedConcurrency": None, "provisionedConcurrency": 0})
+    assert profile["reservedConcurrency"] is None
+    assert profile["provisionedConcurrency"] == 0
@@ -0,0 +1,46 @@
+import pytest
+
+from setup.metadata_schema import (
+    FIELD_MAPPING_TYPES,
+    METADATA_SCHEMA,
+    field_mapping,
+    index_attribute_configuration,
+)
+
+
+def test_number_fields_map_to_long():
+    assert field_mapping({"name": "demand_amount", "type": "NUMBER"}) == {
+        "indexFieldName": "demand_amount",
+        "indexFieldType": "LONG",
+        "dataSourceFieldName": "demand_amount"
+    }
+
+
+def test_date_fields_map_with_date_format():
+    assert field_mapping({"name": "date_of_loss", "type": "DATE"}) == {
+        "indexFieldName": "date_of_loss",
+        "indexFieldType": "DATE",
+        "dataSourceFieldName": "date_of_loss",
+        "dateFieldFormat": "yyyy-MM-dd'T'HH:mm:ss'Z'"
+    }
+
+
+@pytest.mark.parametrize("field_type", ["STRING", "STRING_LIST"])
+def test_string_fields_keep_their_type(field_type):
+    mapping = field_mapping({"name": "claim_number", "type": field_type})
+    assert mapping["indexFieldType"] == field_type
+    assert "dateFieldFormat" not in mapping
+
+
+def test_index_attributes_keep_the_schema_type():
+    assert index_attribute_configuration({"name": "demand_amount", "type": "NUMBER"}) == {
+        "name": "demand_amount",
+        "type": "NUMBER",
+        "search": "ENABLED"
+    }
+
+
+def test_schema_types_are_supported():
+    for field in METADATA_SCHEMA:
+        assert field["type"] in FIELD_MAPPING_TYPES
+        assert field_mapping(field)["indexFieldName"] == index_attribute_configuration(field)["name"]
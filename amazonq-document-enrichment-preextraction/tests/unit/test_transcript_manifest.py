@@ -0,0 +1,96 @@
+import hashlib
+
+from transcript_manifest import build_manifest, delete_stale_page_objects, manifest_to_markdown, page_objects_prefix
+
+SOURCE_KEY = "letters/demand letter.pdf"
+TARGET_KEY = "pre-extraction/letters/demand letter.pdf.txt"
+RESULTS = [
+    (1, "  # Demand Letter  \n  Claim: C-1 ", {}),
+    (2, "Damages — €1.200 ✓", {}),
+    (3, "", {}),
+]
+
+
+def test_page_offsets_allow_ranged_reads():
+    transcript, manifest = build_manifest(SOURCE_KEY, TARGET_KEY, RESULTS)
+    assert manifest["pageCount"] == 3
+    assert [page["pageNumber"] for page in manifest["pages"]] == [1, 2, 3]
+
+    for page in manifest["pages"]:
+        page_text = transcript[page["offset"]:page["offset"] + page["length"]]
+        assert page_text.startswith(f"Page Number: {page['pageNumber']}\n".encode('utf-8'))
+        assert hashlib.sha256(page_text).hexdigest() == page["sha256"]
+
+    last_page = manifest["pages"][-1]
+    assert last_page["offset"] + last_page["length"] == len(transcript)
+
+
+def test_transcript_keeps_the_plain_text_format():
+    transcript, _ = build_manifest(SOURCE_KEY, TARGET_KEY, RESULTS)
+    assert transcript.decode('utf-8') == (
+        "Page Number: 1\n# Demand Letter\nClaim: C-1\n\n"
+        "Page Number: 2\nDamages — €1.200 ✓\n\n"
+        "Page Number: 3\n\n\n"
+    )
+
+
+def test_page_objects_are_listed_only_when_enabled():
+    _, manifest = build_manifest(SOURCE_KEY, TARGET_KEY, RESULTS)
+    assert all("s3ObjectKey" not in page for page in manifest["pages"])
+
+    _, manifest = build_manifest(SOURCE_KEY, TARGET_KEY, RESULTS, with_page_objects=True)
+    assert [page["s3ObjectKey"] for page in manifest["pages"]] == [
+        f"pre-extraction/{SOURCE_KEY}.pages/page_{page_number}.txt" for page_number in (1, 2, 3)
+    ]
+
+
+def test_markdown_byte_ranges_are_inclusive():
+    transcript, manifest = build_manifest(SOURCE_KEY, TARGET_KEY, RESULTS, with_page_objects=True)
+    rows = manifest_to_markdown(manifest).splitlines()[6:]
+    assert len(rows) == 3
+
+    for row, page in zip(rows, manifest["pages"]):
+        cells = [cell.strip() for cell in row.strip("|").split("|")]
+        first_byte, last_byte = (int(byte) for byte in cells[1].split("-"))
+        # an HTTP Range header of bytes=first-last returns exactly the page
+        assert transcript[first_byte:last_byte + 1] == transcript[page["offset"]:page["offset"] + page["length"]]
+        assert cells[2] == page["sha256"]
+        assert cells[3] == page["s3ObjectKey"]
+
+
+class FakeS3Client:
+    def __init__(self, keys):
+        self.keys = keys
+        self.deleted = []
+
+    def get_paginator(self, operation_name):
+        assert operation_name == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = [key for key in self.keys if key.startswith(Prefix)]
+        for start in range(0, len(keys), 1000):
+            yield {"Contents": [{"Key": key} for key in keys[start:start + 1000]]}
+
+    def delete_objects(self, Bucket, Delete):
+        assert len(Delete["Objects"]) <= 1000
+        self.deleted.extend(s3_object["Key"] for s3_object in Delete["Objects"])
+
+
+def test_delete_stale_page_objects_keeps_current_pages():
+    prefix = page_objects_prefix(SOURCE_KEY)
+    keys = [f"{prefix}page_{page_number}.txt" for page_number in range(1, 1503)]
+    s3_client = FakeS3Client(keys + [TARGET_KEY])
+
+    delete_stale_page_objects(s3_client, "bucket", prefix, set(keys[:2]))
+
+    assert s3_client.deleted == keys[2:]
+
+
+def test_delete_stale_page_objects_without_stale_pages():
+    prefix = page_objects_prefix(SOURCE_KEY)
+    s3_client = FakeS3Client([f"{prefix}page_1.txt"])
+
+    delete_stale_page_objects(s3_client, "bucket", prefix, {f"{prefix}page_1.txt"})
+
+    assert s3_client.deleted == []